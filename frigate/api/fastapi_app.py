@@ -1,7 +1,9 @@
 import logging
 import re
+from contextlib import asynccontextmanager
 from typing import Optional
 
+import aiohttp
 from fastapi import FastAPI, Request
 from fastapi.responses import JSONResponse
 from joserfc.jwk import OctKey
@@ -66,9 +68,35 @@ def create_fastapi_app(
     dispatcher: Optional[Dispatcher] = None,
 ):
     logger.info("Starting FastAPI app")
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        # shared outbound HTTP session so connections are pooled and kept alive
+        # across requests instead of being re-established for every call
+        app.state.http_session = aiohttp.ClientSession(
+            timeout=aiohttp.ClientTimeout(total=10),
+            # cap per host so one slow action endpoint can't take the whole pool
+            connector=aiohttp.TCPConnector(
+                limit=200,
+                limit_per_host=30,
+                ttl_dns_cache=300,
+                keepalive_timeout=75,
+            ),
+            cookie_jar=aiohttp.DummyCookieJar(),
+        )
+        # camera name -> (expiry, stats) for the notification weight stats
+        app.state.weight_stats_cache = {}
+        logger.info("FastAPI started")
+
+        try:
+            yield
+        finally:
+            await app.state.http_session.close()
+
     app = FastAPI(
         debug=False,
         swagger_ui_parameters={"apisSorter": "alpha", "operationsSorter": "alpha"},
+        lifespan=lifespan,
     )
 
     # update the request_address with the x-forwarded-for header from nginx
@@ -100,10 +128,6 @@ def create_fastapi_app(
             database.close()
         return response
 
-    @app.on_event("startup")
-    async def startup():
-        logger.info("FastAPI started")
-
     # Rate limiter (used for login endpoint)
     if frigate_config.auth.failed_login_rate_limit is None:
         limiter.enabled = False
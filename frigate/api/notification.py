@@ -1,18 +1,23 @@
 """Notification apis."""
 
+import asyncio
 import logging
 import os
-from typing import Any
+import time
+from functools import lru_cache
+from typing import Any, Optional
 
+import orjson
 from cryptography.hazmat.primitives import serialization
 from fastapi import APIRouter, Depends, HTTPException, Path, Query, Request
-from fastapi.responses import JSONResponse
-from peewee import DoesNotExist
+from fastapi.responses import JSONResponse, ORJSONResponse, Response
+from peewee import SQL
 from py_vapid import Vapid01, utils
 
 from frigate.api.auth import get_current_user, require_role
 from frigate.api.defs.request.notification_body import SendNotificationBody
 from frigate.api.defs.tags import Tags
+from frigate.comms.webpush import WebPushClient
 from frigate.const import CONFIG_DIR
 from frigate.models import User
 
@@ -21,24 +26,86 @@ logger = logging.getLogger(__name__)
 router = APIRouter(tags=[Tags.notifications])
 
 
-@router.get("/notifications/pubkey")
-def get_vapid_pub_key(request: Request):
-    config = request.app.frigate_config
-    notifications_enabled = config.notifications.enabled
-    camera_notifications_enabled = [
-        c for c in config.cameras.values() if c.enabled and c.notifications.enabled
-    ]
-    if not (notifications_enabled or camera_notifications_enabled):
-        return JSONResponse(
-            content=({"success": False, "message": "Notifications are not enabled."}),
-            status_code=400,
-        )
+def _message_body(success: bool, message: str) -> bytes:
+    """Encode a fixed response body the same way ORJSONResponse would."""
+    return orjson.dumps({"success": success, "message": message})
+
+
+# responses with fixed messages are encoded once instead of on every request
+NOTIFICATIONS_DISABLED_BODY = _message_body(False, "Notifications are not enabled.")
+SUBSCRIPTION_REQUIRED_BODY = _message_body(False, "Subscription must be provided.")
+INVALID_SUBSCRIPTION_BODY = _message_body(
+    False, "Subscription must be an object with an endpoint."
+)
+TOKEN_SAVED_BODY = _message_body(True, "Successfully saved token.")
+USER_NOT_FOUND_BODY = _message_body(False, "Could not find user.")
+TITLE_REQUIRED_BODY = _message_body(False, "Title is required.")
+MESSAGE_REQUIRED_BODY = _message_body(False, "Message is required.")
+WEBPUSH_UNAVAILABLE_BODY = _message_body(False, "WebPush client not available.")
+NO_USERS_REGISTERED_BODY = _message_body(False, "No users registered for notifications.")
+
+# weights only change when notifications are sent, so dashboards polling the
+# stats endpoints can be served from a short lived cache on app.state
+WEIGHT_STATS_CACHE_TTL = 5
+
+
+async def get_web_push_client(request: Request) -> Optional[WebPushClient]:
+    """Dependency returning the dispatcher's WebPush client, if it is running."""
+    dispatcher = request.app.dispatcher
+    return dispatcher.web_push_client if dispatcher else None
+
+
+async def require_web_push_client(
+    web_push_client: Optional[WebPushClient] = Depends(get_web_push_client),
+) -> WebPushClient:
+    """Dependency that fails the request when no WebPush client is running."""
+    if not web_push_client:
+        raise HTTPException(status_code=503, detail="WebPush client not available")
 
+    return web_push_client
+
+
+async def get_cached_weight_statistics(
+    request: Request, web_push_client: WebPushClient, camera_name: str
+) -> dict[str, Any]:
+    """Get weight statistics for a camera, reusing results for a few seconds."""
+    cache: dict[str, tuple[float, dict[str, Any]]] = (
+        request.app.state.weight_stats_cache
+    )
+    cached = cache.get(camera_name)
+
+    if cached is not None and cached[0] > time.monotonic():
+        return cached[1]
+
+    # only a cache miss needs to compute the stats off the event loop
+    stats = await asyncio.to_thread(web_push_client.get_weight_statistics, camera_name)
+    cache[camera_name] = (
+        time.monotonic() + WEIGHT_STATS_CACHE_TTL,
+        stats,
+    )
+    return stats
+
+
+@lru_cache(maxsize=1)
+def get_vapid_pub_key_b64() -> str:
+    """Load the VAPID public key once, it does not change while Frigate runs."""
     key = Vapid01.from_file(os.path.join(CONFIG_DIR, "notifications.pem"))
     raw_pub = key.public_key.public_bytes(
         serialization.Encoding.X962, serialization.PublicFormat.UncompressedPoint
     )
-    return JSONResponse(content=utils.b64urlencode(raw_pub), status_code=200)
+    return utils.b64urlencode(raw_pub)
+
+
+@router.get("/notifications/pubkey")
+async def get_vapid_pub_key(request: Request):
+    if not request.app.frigate_config.notifications_any_enabled:
+        return Response(
+            content=NOTIFICATIONS_DISABLED_BODY,
+            media_type="application/json",
+            status_code=400,
+        )
+
+    return ORJSONResponse(content=get_vapid_pub_key_b64(), status_code=200)
 
 
 @router.post("/notifications/register")
@@ -53,192 +120,256 @@ def register_notifications(request: Request, body: dict = None):
     sub = json.get("sub")
 
     if not sub:
-        return JSONResponse(
-            content={"success": False, "message": "Subscription must be provided."},
+        return Response(
+            content=SUBSCRIPTION_REQUIRED_BODY,
+            media_type="application/json",
             status_code=400,
         )
 
-    try:
-        User.update(notification_tokens=User.notification_tokens.append(sub)).where(
-            User.username == username
-        ).execute()
-        return JSONResponse(
-            content=({"success": True, "message": "Successfully saved token."}),
-            status_code=200,
+    if not isinstance(sub, dict) or not isinstance(sub.get("endpoint"), str):
+        return Response(
+            content=INVALID_SUBSCRIPTION_BODY,
+            media_type="application/json",
+            status_code=400,
+        )
+
+    sub_json = orjson.dumps(sub).decode()
+
+    # a browser re-registering keeps its endpoint but may rotate its keys, so
+    # drop any stored subscription for the endpoint and append the new one in
+    # a single UPDATE. Registering the identical subscription again is a no-op
+    updated = (
+        User.update(
+            notification_tokens=SQL(
+                "json_insert(("
+                "SELECT json_group_array(json(value)) "
+                "FROM json_each(notification_tokens) "
+                "WHERE json_extract(value, '$.endpoint') IS NOT ?"
+                "), '$[#]', json(?))",
+                [sub["endpoint"], sub_json],
+            )
+        )
+        .where(
+            User.username == username,
+            SQL(
+                "NOT EXISTS (SELECT 1 FROM json_each(notification_tokens) "
+                "WHERE value = json(?))",
+                [sub_json],
+            ),
         )
-    except DoesNotExist:
-        return JSONResponse(
-            content=({"success": False, "message": "Could not find user."}),
+        .execute()
+    )
+
+    if (
+        not updated
+        and not User.select().where(User.username == username).exists()
+    ):
+        return Response(
+            content=USER_NOT_FOUND_BODY,
+            media_type="application/json",
             status_code=404,
         )
 
+    return Response(
+        content=TOKEN_SAVED_BODY,
+        media_type="application/json",
+        status_code=200,
+    )
+
+
+def custom_notification_params(
+    title: str = Query(
+        None, max_length=200, description="Notification title (max 200 characters)"
+    ),
+    message: str = Query(
+        None, max_length=500, description="Notification message (max 500 characters)"
+    ),
+    direct_url: str = Query(
+        "", max_length=500, description="URL to open when notification is clicked"
+    ),
+    image: str = Query(
+        "", max_length=500, description="Image URL to display in notification"
+    ),
+    ttl: int = Query(0, ge=0, le=86400, description="Time to live in seconds (0 = no expiration)"),
+) -> dict[str, Any]:
+    """Query parameters shared by the GET and POST custom notification routes."""
+    return {
+        "title": title,
+        "message": message,
+        "direct_url": direct_url,
+        "image": image,
+        "ttl": ttl,
+    }
+
 
-@router.post("/notifications/send", dependencies=[Depends(require_role(["admin"]))])
 @router.get("/notifications/send", dependencies=[Depends(require_role(["admin"]))])
+async def send_custom_notification_get(
+    request: Request,
+    current_user: dict = Depends(get_current_user),
+    params: dict[str, Any] = Depends(custom_notification_params),
+    web_push_client: Optional[WebPushClient] = Depends(get_web_push_client),
+):
+    """Send a custom notification to all registered users using query parameters.
+
+    Example:
+    GET  /api/notifications/send?title=Hello&message=World
+    """
+    if isinstance(current_user, JSONResponse):
+        return current_user
+
+    return await _send_custom_notification(
+        request, current_user, web_push_client, **params
+    )
+
+
+@router.post("/notifications/send", dependencies=[Depends(require_role(["admin"]))])
 async def send_custom_notification(
     request: Request,
     current_user: dict = Depends(get_current_user),
     body: SendNotificationBody = None,
-    title: str = Query(None, description="Notification title (max 200 characters)"),
-    message: str = Query(None, description="Notification message (max 500 characters)"),
-    direct_url: str = Query("", description="URL to open when notification is clicked"),
-    image: str = Query("", description="Image URL to display in notification"),
-    ttl: int = Query(0, ge=0, le=86400, description="Time to live in seconds (0 = no expiration)"),
+    params: dict[str, Any] = Depends(custom_notification_params),
+    web_push_client: Optional[WebPushClient] = Depends(get_web_push_client),
 ):
     """Send a custom notification to all registered users.
     
-    Parameters can be passed either in the request body (POST) or as query parameters (GET/POST).
+    Parameters can be passed either in the request body or as query parameters.
     Query parameters take precedence over body parameters.
     
     Examples:
-    GET  /api/notifications/send?title=Hello&message=World
     POST /api/notifications/send?title=Hello&message=World
     POST /api/notifications/send (with JSON body)
     """
     if isinstance(current_user, JSONResponse):
         return current_user
 
-    # Get parameters from query string or body
-    # Query parameters take precedence
-    notification_title = title or (body.title if body else None)
-    notification_message = message or (body.message if body else None)
-    notification_direct_url = direct_url or (body.direct_url if body else "")
-    notification_image = image or (body.image if body else "")
-    notification_ttl = ttl or (body.ttl if body else 0)
+    if body is not None:
+        for key, value in params.items():
+            if not value:
+                params[key] = getattr(body, key)
 
-    # Validate required parameters
-    if not notification_title:
-        return JSONResponse(
-            content=({"success": False, "message": "Title is required."}),
-            status_code=400,
-        )
-    
-    if not notification_message:
-        return JSONResponse(
-            content=({"success": False, "message": "Message is required."}),
-            status_code=400,
-        )
+    return await _send_custom_notification(
+        request, current_user, web_push_client, **params
+    )
 
-    # Validate parameter lengths and values
-    if len(notification_title) > 200:
-        return JSONResponse(
-            content=({"success": False, "message": "Title too long (max 200 characters)."}),
-            status_code=400,
-        )
-    
-    if len(notification_message) > 500:
-        return JSONResponse(
-            content=({"success": False, "message": "Message too long (max 500 characters)."}),
+
+async def _send_custom_notification(
+    request: Request,
+    current_user: dict,
+    web_push_client: Optional[WebPushClient],
+    title: str,
+    message: str,
+    direct_url: str,
+    image: str,
+    ttl: int,
+):
+    """Validate the merged parameters and queue the notification for all users."""
+    # Validate required parameters
+    if not title:
+        return Response(
+            content=TITLE_REQUIRED_BODY,
+            media_type="application/json",
             status_code=400,
         )
     
-    if notification_ttl < 0 or notification_ttl > 86400:
-        return JSONResponse(
-            content=({"success": False, "message": "TTL must be between 0 and 86400 seconds."}),
+    if not message:
+        return Response(
+            content=MESSAGE_REQUIRED_BODY,
+            media_type="application/json",
             status_code=400,
         )
 
-    config = request.app.frigate_config
-    dispatcher = request.app.dispatcher
-
     # Check if notifications are enabled globally or for any camera
-    notifications_enabled = config.notifications.enabled
-    camera_notifications_enabled = [
-        c for c in config.cameras.values() if c.enabled and c.notifications.enabled
-    ]
-    
-    if not (notifications_enabled or camera_notifications_enabled):
-        return JSONResponse(
-            content=({"success": False, "message": "Notifications are not enabled."}),
+    if not request.app.frigate_config.notifications_any_enabled:
+        return Response(
+            content=NOTIFICATIONS_DISABLED_BODY,
+            media_type="application/json",
             status_code=400,
         )
 
-    # Check if dispatcher and webpush client are available
-    if not dispatcher or not dispatcher.web_push_client:
-        return JSONResponse(
-            content=({"success": False, "message": "WebPush client not available."}),
+    # Check if webpush client is available
+    if not web_push_client:
+        return Response(
+            content=WEBPUSH_UNAVAILABLE_BODY,
+            media_type="application/json",
             status_code=503,
         )
 
     try:
-        # Send notification to all registered users
-        web_push_client = dispatcher.web_push_client
-        web_push_client.check_registrations()
+        users = list(web_push_client.web_pushers)
 
-        if not web_push_client.web_pushers:
-            return JSONResponse(
-                content=({"success": False, "message": "No users registered for notifications."}),
+        if not users:
+            return Response(
+                content=NO_USERS_REGISTERED_BODY,
+                media_type="application/json",
                 status_code=400,
             )
 
-        # Send to all registered users
-        for user in web_push_client.web_pushers:
+        # Queue for all registered users, the webpush thread does the network I/O
+        for user in users:
             web_push_client.send_push_notification(
                 user=user,
                 payload={"type": "custom", "sender": current_user["username"]},
-                title=notification_title,
-                message=notification_message,
-                direct_url=notification_direct_url or "/",
-                image=notification_image or "",
+                title=title,
+                message=message,
+                direct_url=direct_url or "/",
+                image=image or "",
                 notification_type="custom",
-                ttl=notification_ttl,
+                ttl=ttl or 0,
             )
 
-        user_count = len(web_push_client.web_pushers)
-        return JSONResponse(
-            content=({"success": True, "message": f"Notification sent to {user_count} user(s)."}),
+        return ORJSONResponse(
+            content=({"success": True, "message": f"Notification sent to {len(users)} user(s)."}),
             status_code=200,
         )
 
     except Exception as e:
         logger.error(f"Error sending custom notification: {e}")
-        return JSONResponse(
+        return ORJSONResponse(
             content=({"success": False, "message": f"Error sending notification: {str(e)}"}),
             status_code=500,
         )
 
 
 @router.get("/notifications/weight-stats/{camera_name}")
-def get_weight_statistics(request: Request, camera_name: str = Path(..., title="Camera name")):
+async def get_weight_statistics(
+    request: Request,
+    camera_name: str = Path(..., title="Camera name"),
+    web_push_client: WebPushClient = Depends(require_web_push_client),
+):
     """Get notification weight statistics for a specific camera."""
-    config = request.app.frigate_config
-    dispatcher = request.app.dispatcher
-    
     # Check if camera exists
-    if camera_name not in config.cameras:
+    if camera_name not in request.app.frigate_config.cameras:
         raise HTTPException(status_code=404, detail=f"Camera {camera_name} not found")
     
-    # Check if dispatcher and webpush client are available
-    if not dispatcher or not dispatcher.web_push_client:
-        raise HTTPException(status_code=503, detail="WebPush client not available")
-    
     # Get weight statistics from WebPushClient
     try:
-        stats = dispatcher.web_push_client.get_weight_statistics(camera_name)
-        return JSONResponse(content=stats, status_code=200)
+        stats = await get_cached_weight_statistics(
+            request, web_push_client, camera_name
+        )
+        return ORJSONResponse(content=stats, status_code=200)
     except Exception as e:
         logger.error(f"Error getting weight statistics for {camera_name}: {e}")
         raise HTTPException(status_code=500, detail=f"Error getting weight statistics: {str(e)}")
 
 
 @router.get("/notifications/weight-stats")
-def get_all_weight_statistics(request: Request):
+async def get_all_weight_statistics(
+    request: Request,
+    web_push_client: WebPushClient = Depends(require_web_push_client),
+):
     """Get notification weight statistics for all cameras."""
-    config = request.app.frigate_config
-    dispatcher = request.app.dispatcher
-    
-    # Check if dispatcher and webpush client are available
-    if not dispatcher or not dispatcher.web_push_client:
-        raise HTTPException(status_code=503, detail="WebPush client not available")
-    
     # Get weight statistics for all cameras
     try:
-        all_stats = {}
-        for camera_name in config.cameras.keys():
-            if config.cameras[camera_name].enabled and config.cameras[camera_name].notifications.enabled:
-                all_stats[camera_name] = dispatcher.web_push_client.get_weight_statistics(camera_name)
-        
-        return JSONResponse(content=all_stats, status_code=200)
+        camera_names = list(request.app.frigate_config.notification_enabled_cameras)
+        results = await asyncio.gather(
+            *(
+                get_cached_weight_statistics(request, web_push_client, camera_name)
+                for camera_name in camera_names
+            )
+        )
+        all_stats = dict(zip(camera_names, results))
+
+        return ORJSONResponse(content=all_stats, status_code=200)
     except Exception as e:
         logger.error(f"Error getting weight statistics for all cameras: {e}")
         raise HTTPException(status_code=500, detail=f"Error getting weight statistics: {str(e)}")
\ No newline at end of file
@@ -571,6 +571,10 @@ class FrigateApp:
                 host="127.0.0.1",
                 port=5001,
                 log_level="error",
+                # provided by uvicorn[standard] via fastapi[standard], pinned
+                # here so a missing wheel fails loudly instead of falling back
+                loop="uvloop",
+                http="httptools",
             )
         finally:
             self.stop()
@@ -363,6 +363,7 @@ class Dispatcher:
                 logger.info(f"Turning off camera {camera_name}")
                 camera_settings.enabled = False
 
+        self.config.update_notification_state()
         self.config_updater.publish_update(
             CameraConfigUpdateTopic(CameraConfigUpdateEnum.enabled, camera_name),
             camera_settings.enabled,
@@ -681,6 +682,7 @@ class Dispatcher:
             ):
                 self.web_push_client.suspended_cameras[camera_name] = 0
 
+        self.config.update_notification_state()
         self.config_updater.publish_update(
             CameraConfigUpdateTopic(CameraConfigUpdateEnum.notifications, camera_name),
             notification_settings,
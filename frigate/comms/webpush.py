@@ -1,22 +1,35 @@
 """Handle sending notifications for Frigate via Firebase."""
 
+import bisect
 import datetime
+import heapq
 import json
 import logging
 import os
 import queue
+import stat
+import tempfile
 import threading
-from dataclasses import dataclass
+import time
+from array import array
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, replace
+from functools import lru_cache
 from multiprocessing.synchronize import Event as MpEvent
-from typing import Any, Callable
+from typing import Any, Callable, Optional
 
+import numpy as np
+import orjson
+import requests
 from py_vapid import Vapid01
 from pywebpush import WebPusher
+from requests.adapters import HTTPAdapter
 from titlecase import titlecase
 
 from frigate.comms.base_communicator import Communicator
 from frigate.comms.config_updater import ConfigSubscriber
 from frigate.config import FrigateConfig
+from frigate.config.camera.notification import NotificationConfig
 from frigate.config.camera.updater import (
     CameraConfigUpdateEnum,
     CameraConfigUpdateSubscriber,
@@ -26,6 +39,20 @@ from frigate.models import User
 
 logger = logging.getLogger(__name__)
 
+_UNDERSCORE_TO_SPACE = str.maketrans("_", " ")
+
+
+@lru_cache(maxsize=512)
+def _display_label(label: str) -> str:
+    """Format labels, zones and trigger types for notification text."""
+    return str(titlecase(label.translate(_UNDERSCORE_TO_SPACE)))
+
+
+@lru_cache(maxsize=256)
+def _format_timestamp(timestamp: int) -> str:
+    """Formatiert einen Unix-Timestamp für Statistiken und Logs."""
+    return datetime.datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d %H:%M:%S")
+
 
 @dataclass
 class PushNotification:
@@ -37,6 +64,47 @@ class PushNotification:
     image: str = ""
     notification_type: str = "alert"
     ttl: int = 0
+    # pre-encoded payload when the same message is sent to all users
+    data: bytes = b""
+
+
+@dataclass(frozen=True)
+class WeightClock:
+    """Zeitpunkt einer Gewichts-Entscheidung, wird einmal pro Aufruf bestimmt."""
+
+    timestamp: float
+    hour: int
+    weekday: int  # 0=Montag, 6=Sonntag
+
+    @classmethod
+    def now(cls) -> "WeightClock":
+        timestamp = time.time()
+        local = time.localtime(timestamp)
+        return cls(timestamp, local.tm_hour, local.tm_wday)
+
+
+@dataclass(frozen=True, slots=True)
+class CameraWeightConfig:
+    """Gewichts-Einstellungen einer Kamera als einfache Attribute."""
+
+    cooldown: int
+    weight_factor: float
+    weight_max_factor: float
+    weight_time_slots: int
+    weight_decay_seconds: float
+    seconds_per_bucket: float
+
+    @classmethod
+    def from_config(cls, notifications: NotificationConfig) -> "CameraWeightConfig":
+        return cls(
+            cooldown=notifications.cooldown,
+            weight_factor=notifications.weight_factor,
+            weight_max_factor=notifications.weight_max_factor,
+            weight_time_slots=notifications.weight_time_slots,
+            weight_decay_seconds=notifications.weight_decay_days * 86400,
+            # 86400 = Sekunden pro Tag
+            seconds_per_bucket=86400 / notifications.weight_time_slots,
+        )
 
 
 class WebPushClient(Communicator):
@@ -47,7 +115,8 @@ class WebPushClient(Communicator):
         self.stop_event = stop_event
         self.claim_headers: dict[str, dict[str, str]] = {}
         self.refresh: int = 0
-        self.web_pushers: dict[str, list[WebPusher]] = {}
+        # pushers per user, together with the origin of their push service
+        self.web_pushers: dict[str, tuple[tuple[str, WebPusher], ...]] = {}
         self.expired_subs: dict[str, list[str]] = {}
         self.suspended_cameras: dict[str, int] = {
             c.name: 0  # type: ignore[misc]
@@ -58,18 +127,55 @@ class WebPushClient(Communicator):
             for c in self.config.cameras.values()
         }
         self.last_notification_time: float = 0
-        # Gewicht-Queues pro Kamera und Stunde: {camera: {hour: [timestamps]}}
-        # Jeder Timestamp repräsentiert eine Benachrichtigung
+        # look up camera settings once instead of going through
+        # self.config.cameras[camera]... for every event
+        self.camera_notification_configs: dict[str, NotificationConfig] = {
+            name: c.notifications for name, c in self.config.cameras.items()
+        }
+        self.camera_weight_configs: dict[str, CameraWeightConfig] = {
+            name: CameraWeightConfig.from_config(c.notifications)
+            for name, c in self.config.cameras.items()
+        }
+        self.camera_display_names: dict[str, str] = {
+            name: self._camera_display_name(name) for name in self.config.cameras
+        }
+        # Gewicht-Queues pro Kamera und Stunde: {camera: {hour: array('d', timestamps)}}
+        # Jeder Timestamp repräsentiert eine Benachrichtigung, als kompaktes
+        # double-Array statt einer Liste von float-Objekten
         self.weights_file = os.path.join(CONFIG_DIR, "notification_weights.json")
-        self.camera_weight_queues: dict[str, dict[int, list[float]]] = self._load_weights()
-        self.last_weights_save_time: float = 0
+        self.camera_weight_queues: dict[str, dict[int, array]] = self._load_weights()
+        # Min-Heap mit (Ablaufzeit, Kamera, Stunde) pro nicht leerem Bucket,
+        # geordnet nach dem ältesten Gewicht, damit das Decay nur die
+        # tatsächlich ablaufenden Buckets anfassen muss
+        self._expiry_heap: list[tuple[float, str, int]] = []
+        # Buckets, die bereits einen Eintrag im Heap haben
+        self._expiry_scheduled: set[tuple[str, int]] = set()
+        self._rebuild_expiry_heap()
         self.weights_save_interval: float = 30.0  # Speichere nur alle 30 Sekunden
-        self.pending_weight_changes: bool = False
-        self.notification_queue: queue.Queue[PushNotification] = queue.Queue()
+        # Gesetzt wenn sich Gewichte geändert haben, der Speicher-Thread
+        # schreibt dann gebündelt höchstens einmal pro Intervall
+        self.weights_changed = threading.Event()
+        # None is the stop signal for the notification thread
+        self.notification_queue: queue.SimpleQueue[Optional[PushNotification]] = (
+            queue.SimpleQueue()
+        )
+        self.send_pool = ThreadPoolExecutor(
+            max_workers=16, thread_name_prefix="webpush"
+        )
+        # shared session for all pushers so TLS connections to the push
+        # services are reused instead of reconnecting for every message
+        self.session = requests.Session()
+        self.session.mount(
+            "https://", HTTPAdapter(pool_connections=8, pool_maxsize=16)
+        )
         self.notification_thread = threading.Thread(
             target=self._process_notifications, daemon=True
         )
         self.notification_thread.start()
+        self.weights_thread = threading.Thread(
+            target=self._save_weights_loop, daemon=True
+        )
+        self.weights_thread.start()
 
         if not self.config.notifications.email:
             logger.warning("Email must be provided for push notifications to be sent.")
@@ -81,9 +187,9 @@ class WebPushClient(Communicator):
             User.select(User.username, User.notification_tokens).dicts().iterator()
         )
         for user in users:
-            self.web_pushers[user["username"]] = []
-            for sub in user["notification_tokens"]:
-                self.web_pushers[user["username"]].append(WebPusher(sub))
+            self.web_pushers[user["username"]] = self._create_pushers(
+                user["notification_tokens"]
+            )
 
         # notification config updater
         self.global_config_subscriber = ConfigSubscriber(
@@ -93,24 +199,51 @@ class WebPushClient(Communicator):
             self.config, self.config.cameras, [CameraConfigUpdateEnum.notifications]
         )
 
+    def _camera_display_name(self, camera: str) -> str:
+        return getattr(
+            self.config.cameras[camera], "friendly_name", None
+        ) or _display_label(camera)
+
+    def _refresh_camera_config(self, camera: str) -> None:
+        """Apply changed notification settings of a camera."""
+        notifications = self.config.cameras[camera].notifications
+        self.camera_notification_configs[camera] = notifications
+        self.camera_weight_configs[camera] = CameraWeightConfig.from_config(
+            notifications
+        )
+
     def subscribe(self, receiver: Callable) -> None:
         """Wrapper for allowing dispatcher to subscribe."""
         pass
 
+    def _create_pushers(
+        self, subs: list[dict[str, Any]]
+    ) -> tuple[tuple[str, WebPusher], ...]:
+        """Create WebPushers along with the precomputed origin of their push service."""
+        pushers = []
+        for sub in subs:
+            endpoint: str = sub["endpoint"]
+            pushers.append(
+                (
+                    endpoint[: endpoint.index("/", 10)],
+                    WebPusher(sub, requests_session=self.session),
+                )
+            )
+
+        return tuple(pushers)
+
     def check_registrations(self) -> None:
         # check for valid claim or create new one
-        now = datetime.datetime.now().timestamp()
+        now = time.time()
         if len(self.claim_headers) == 0 or self.refresh < now:
-            self.refresh = int(
-                (datetime.datetime.now() + datetime.timedelta(hours=1)).timestamp()
-            )
-            endpoints: set[str] = set()
-
+            # the exp of VAPID claims must be wall clock time
+            self.refresh = int(now + 3600)
             # get a unique set of push endpoints
-            for pushers in self.web_pushers.values():
-                for push in pushers:
-                    endpoint: str = push.subscription_info["endpoint"]
-                    endpoints.add(endpoint[0 : endpoint.index("/", 10)])
+            endpoints: set[str] = {
+                origin
+                for pushers in self.web_pushers.values()
+                for origin, _ in pushers
+            }
 
             # create new claim
             for endpoint in endpoints:
@@ -119,7 +252,12 @@ class WebPushClient(Communicator):
                     "aud": endpoint,
                     "exp": self.refresh,
                 }
-                self.claim_headers[endpoint] = self.vapid.sign(claim)
+                # urgency is set once here so the headers do not need to be
+                # copied for every push
+                self.claim_headers[endpoint] = {
+                    **self.vapid.sign(claim),
+                    "urgency": "high",
+                }
 
     def cleanup_registrations(self) -> None:
         # delete any expired subs
@@ -140,10 +278,7 @@ class WebPushClient(Communicator):
                     User.username == user
                 ).execute()
 
-                self.web_pushers[user] = []
-
-                for sub in user_subs:
-                    self.web_pushers[user].append(WebPusher(sub))
+                self.web_pushers[user] = self._create_pushers(user_subs)
 
                 logger.info(
                     f"Cleaned up {len(expired)} notification subscriptions for {user}"
@@ -151,29 +286,38 @@ class WebPushClient(Communicator):
 
         self.expired_subs = {}
 
-    def _load_weights(self) -> dict[str, dict[int, list[float]]]:
+    def _load_weights(self) -> dict[str, dict[int, array]]:
         """Lädt gespeicherte Gewichte von der Festplatte."""
         try:
             if os.path.exists(self.weights_file):
-                with open(self.weights_file, 'r') as f:
-                    saved_weights = json.load(f)
+                with open(self.weights_file, 'rb') as f:
+                    saved_weights = orjson.loads(f.read())
                     
                 # Erstelle eine neue Struktur mit den aktuellen Kameras
                 weights = {}
+                now = time.time()
                 for camera_name, camera in self.config.cameras.items():
                     time_slots = camera.notifications.weight_time_slots
                     if camera_name in saved_weights:
+                        # Bereits abgelaufene Gewichte gar nicht erst übernehmen
+                        cutoff = now - self.camera_weight_configs[camera_name].weight_decay_seconds
                         # Lade gespeicherte Gewichte, aber nur für gültige Stunden
                         weights[camera_name] = {}
                         for hour in range(time_slots):
                             hour_str = str(hour)
                             if hour_str in saved_weights[camera_name]:
-                                weights[camera_name][hour] = saved_weights[camera_name][hour_str]
+                                # sortiert, damit abgelaufene Einträge per bisect entfernt werden können
+                                weights[camera_name][hour] = array(
+                                    'd',
+                                    sorted(
+                                        t for t in saved_weights[camera_name][hour_str] if t > cutoff
+                                    ),
+                                )
                             else:
-                                weights[camera_name][hour] = []
+                                weights[camera_name][hour] = array('d')
                     else:
                         # Neue Kamera, initialisiere leere Gewichte
-                        weights[camera_name] = {h: [] for h in range(time_slots)}
+                        weights[camera_name] = {h: array('d') for h in range(time_slots)}
                         
                 logger.info(f"Gewichtsdaten geladen für {len(weights)} Kameras")
                 return weights
@@ -182,44 +326,103 @@ class WebPushClient(Communicator):
             
         # Fallback: erstelle neue leere Struktur
         return {
-            c.name: {h: [] for h in range(c.notifications.weight_time_slots)}
+            c.name: {h: array('d') for h in range(c.notifications.weight_time_slots)}
             for c in self.config.cameras.values()
         }
 
-    def _save_weights(self, force: bool = False) -> None:
-        """Speichert die aktuellen Gewichte auf die Festplatte mit Batch-Optimierung."""
-        current_time = datetime.datetime.now().timestamp()
-        
-        # Speichere nur wenn erzwungen oder genug Zeit vergangen ist und Änderungen vorliegen
-        if not force and (
-            not self.pending_weight_changes or 
-            current_time - self.last_weights_save_time < self.weights_save_interval
-        ):
+    def _rebuild_expiry_heap(self) -> None:
+        """Baut den Ablauf-Heap aus allen gespeicherten Gewichten neu auf."""
+        heap: list[tuple[float, str, int]] = []
+        for camera, buckets in self.camera_weight_queues.items():
+            decay_seconds = self.camera_weight_configs[camera].weight_decay_seconds
+            heap.extend(
+                (bucket[0] + decay_seconds, camera, hour)
+                for hour, bucket in buckets.items()
+                if bucket
+            )
+        heapq.heapify(heap)
+        self._expiry_heap = heap
+        self._expiry_scheduled = {(camera, hour) for _, camera, hour in heap}
+
+    def _schedule_expiry(self, camera: str, hour: int, oldest: float) -> None:
+        """Trägt einen Bucket mit dem Ablauf seines ältesten Gewichts in den Heap ein."""
+        if (camera, hour) in self._expiry_scheduled:
             return
-            
+
+        self._expiry_scheduled.add((camera, hour))
+        heapq.heappush(
+            self._expiry_heap,
+            (
+                oldest + self.camera_weight_configs[camera].weight_decay_seconds,
+                camera,
+                hour,
+            ),
+        )
+
+    def _save_weights(self) -> None:
+        """Speichert die aktuellen Gewichte auf die Festplatte."""
         try:
-            # Konvertiere int keys zu strings für JSON serialization
+            # Die Listen werden kopiert da der Dispatcher sie parallel verändern
+            # kann, int keys wandelt orjson selbst in strings um. Leere Buckets
+            # werden ausgelassen, beim Laden werden fehlende Stunden leer angelegt
             serializable_weights = {}
-            for camera, hours in self.camera_weight_queues.items():
-                serializable_weights[camera] = {str(hour): timestamps for hour, timestamps in hours.items()}
+            for camera, hours in list(self.camera_weight_queues.items()):
+                serializable_weights[camera] = {
+                    hour: timestamps.tolist()
+                    for hour, timestamps in list(hours.items())
+                    if timestamps
+                }
                 
-            with open(self.weights_file, 'w') as f:
-                json.dump(serializable_weights, f, indent=2)
+            # mkstemp legt die Datei mit 0600 an, os.replace würde das auf die
+            # Gewichtsdatei übertragen. Daher deren bisherige Rechte übernehmen
+            try:
+                mode = stat.S_IMODE(os.stat(self.weights_file).st_mode)
+            except FileNotFoundError:
+                mode = 0o644
+
+            # Erst in eine temporäre Datei schreiben und dann atomar ersetzen,
+            # damit ein Absturz beim Schreiben die Gewichtsdatei nicht beschädigt
+            fd, tmp_path = tempfile.mkstemp(
+                dir=os.path.dirname(self.weights_file), suffix=".tmp"
+            )
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    os.fchmod(f.fileno(), mode)
+                    f.write(
+                        orjson.dumps(
+                            serializable_weights,
+                            option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS,
+                        )
+                    )
+                    f.flush()
+                    os.fsync(f.fileno())
+
+                os.replace(tmp_path, self.weights_file)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
                 
-            self.last_weights_save_time = current_time
-            self.pending_weight_changes = False
             logger.debug("Gewichtsdaten gespeichert")
         except Exception as e:
             logger.error(f"Fehler beim Speichern der Gewichtsdaten: {e}")
 
+    def _save_weights_loop(self) -> None:
+        """Schreibt geänderte Gewichte gebündelt im Hintergrund."""
+        while not self.stop_event.is_set():
+            # Ohne Änderungen schläft der Thread, stop() weckt ihn zum Beenden
+            self.weights_changed.wait()
+            # Weitere Änderungen über das Intervall sammeln und dann einmal
+            # schreiben, beim Herunterfahren speichert stop()
+            if not self.stop_event.wait(timeout=self.weights_save_interval):
+                self.weights_changed.clear()
+                self._save_weights()
+
     def suspend_notifications(self, camera: str, minutes: int) -> None:
         """Suspend notifications for a specific camera."""
-        suspend_until = int(
-            (datetime.datetime.now() + datetime.timedelta(minutes=minutes)).timestamp()
-        )
+        suspend_until = int(time.time() + minutes * 60)
         self.suspended_cameras[camera] = suspend_until
         logger.info(
-            f"Notifications for {camera} suspended until {datetime.datetime.fromtimestamp(suspend_until).strftime('%Y-%m-%d %H:%M:%S')}"
+            f"Notifications for {camera} suspended until {_format_timestamp(suspend_until)}"
         )
 
     def unsuspend_notifications(self, camera: str) -> None:
@@ -227,8 +430,11 @@ class WebPushClient(Communicator):
         self.suspended_cameras[camera] = 0
         logger.info(f"Notifications for {camera} unsuspended")
 
-    def is_camera_suspended(self, camera: str) -> bool:
-        return datetime.datetime.now().timestamp() <= self.suspended_cameras[camera]
+    def is_camera_suspended(self, camera: str, now: Optional[float] = None) -> bool:
+        if now is None:
+            now = time.time()
+
+        return now <= self.suspended_cameras[camera]
 
     def publish(self, topic: str, payload: Any, retain: bool = False) -> None:
         """Wrapper for publishing when client is in valid state."""
@@ -242,24 +448,33 @@ class WebPushClient(Communicator):
 
         updates = self.config_subscriber.check_for_updates()
 
+        if updates.get("notifications"):
+            for camera in updates["notifications"]:
+                self._refresh_camera_config(camera)
+            # Ablaufzeiten hängen von weight_decay_seconds ab
+            self._rebuild_expiry_heap()
+
         if "add" in updates:
             for camera in updates["add"]:
                 self.suspended_cameras[camera] = 0
                 self.last_camera_notification_time[camera] = 0
+                self._refresh_camera_config(camera)
+                self.camera_display_names[camera] = self._camera_display_name(camera)
                 # Initialize weight queue tracking for new camera
                 self.camera_weight_queues[camera] = {
-                    h: [] for h in range(self.config.cameras[camera].notifications.weight_time_slots)
+                    h: array('d') for h in range(self.camera_weight_configs[camera].weight_time_slots)
                 }
 
         if topic == "reviews":
             decoded = json.loads(payload)
             camera = decoded["before"]["camera"]
-            if not self.config.cameras[camera].notifications.enabled:
+            if not self.camera_notification_configs[camera].enabled:
                 return
-            if self.is_camera_suspended(camera):
+            clock = WeightClock.now()
+            if self.is_camera_suspended(camera, clock.timestamp):
                 logger.debug(f"Notifications for {camera} are currently suspended.")
                 return
-            self.send_alert(decoded)
+            self.send_alert(decoded, clock)
         if topic == "triggers":
             decoded = json.loads(payload)
 
@@ -269,7 +484,7 @@ class WebPushClient(Communicator):
             # ensure notifications are enabled and the specific trigger has
             # notification action enabled
             if (
-                not self.config.cameras[camera].notifications.enabled
+                not self.camera_notification_configs[camera].enabled
                 or name not in self.config.cameras[camera].semantic_search.triggers
                 or "notification"
                 not in self.config.cameras[camera]
@@ -278,10 +493,11 @@ class WebPushClient(Communicator):
             ):
                 return
 
-            if self.is_camera_suspended(camera):
+            clock = WeightClock.now()
+            if self.is_camera_suspended(camera, clock.timestamp):
                 logger.debug(f"Notifications for {camera} are currently suspended.")
                 return
-            self.send_trigger(decoded)
+            self.send_trigger(decoded, clock)
         elif topic == "notification_test":
             if not self.config.notifications.enabled and not any(
                 cam.notifications.enabled for cam in self.config.cameras.values()
@@ -315,60 +531,190 @@ class WebPushClient(Communicator):
         )
         self.notification_queue.put(notification)
 
+    def _send_push_notification_to_all(
+        self,
+        payload: dict[str, Any],
+        title: str,
+        message: str,
+        direct_url: str = "",
+        image: str = "",
+        notification_type: str = "alert",
+        ttl: int = 0,
+    ) -> None:
+        """Queue the same notification for all users."""
+        notification = PushNotification(
+            user="",
+            payload=payload,
+            title=title,
+            message=message,
+            direct_url=direct_url,
+            image=image,
+            notification_type=notification_type,
+            ttl=ttl,
+        )
+        # encode the payload once instead of per user
+        data = self._encode_payload(notification)
+
+        # snapshot of the users, a user's pushers are only ever replaced as a
+        # whole so no lock is needed
+        for user in tuple(self.web_pushers):
+            self.notification_queue.put(replace(notification, user=user, data=data))
+
+    @staticmethod
+    def _encode_payload(notification: PushNotification) -> bytes:
+        """Encode the payload, which is the same for all subscriptions of a user."""
+        return orjson.dumps(
+            {
+                "title": notification.title,
+                "message": notification.message,
+                "direct_url": notification.direct_url,
+                "image": notification.image,
+                "id": notification.payload.get("after", {}).get("id", ""),
+                "type": notification.notification_type,
+            }
+        )
+
+    def _send_to_pusher(
+        self,
+        entry: tuple[str, WebPusher],
+        notification: PushNotification,
+        data: bytes,
+    ) -> tuple[str, Optional[int]]:
+        """Send a notification to a single endpoint."""
+        origin, pusher = entry
+        endpoint = pusher.subscription_info["endpoint"]
+
+        try:
+            # WebPusher.send copies the headers, they are not modified
+            resp = pusher.send(
+                headers=self.claim_headers[origin],
+                ttl=notification.ttl,
+                data=data,
+                timeout=10,
+            )
+        except requests.RequestException as e:
+            logger.error(f"Error sending notification to {notification.user}: {e}")
+            return endpoint, None
+        except Exception:
+            # log unexpected errors with a traceback without aborting the
+            # remaining endpoints of this notification
+            logger.exception(f"Unexpected error sending notification to {notification.user}")
+            return endpoint, None
+
+        return endpoint, resp.status_code
+
+    @staticmethod
+    def _coalesce_notifications(
+        notifications: list[PushNotification],
+    ) -> list[PushNotification]:
+        """Merge queued notifications for the same review per user."""
+        latest: dict[Any, PushNotification] = {}
+        for notification in notifications:
+            review_id = notification.payload.get("after", {}).get("id", "")
+            # review data is cumulative, so the newest message contains all
+            # objects and zones of the older ones. Nothing is merged without a
+            # review id
+            key = (
+                (notification.user, notification.notification_type, review_id)
+                if review_id
+                else id(notification)
+            )
+            latest[key] = notification
+
+        return list(latest.values())
+
+    def _drain_notifications(self) -> tuple[list[PushNotification], bool]:
+        """Wait for the next notification and take all others already queued.
+
+        Returns the coalesced batch and whether the stop signal was received.
+        """
+        # take all notifications that are already waiting so the users of an
+        # alert are sent to together instead of one after another
+        notifications: list[PushNotification] = []
+        notification = self.notification_queue.get()
+
+        while notification is not None:
+            notifications.append(notification)
+
+            if self.notification_queue.empty():
+                return self._coalesce_notifications(notifications), False
+
+            notification = self.notification_queue.get()
+
+        return self._coalesce_notifications(notifications), True
+
     def _process_notifications(self) -> None:
-        while not self.stop_event.is_set():
+        stopping = False
+        while not stopping:
+            notifications, stopping = self._drain_notifications()
+
+            if not notifications:
+                continue
+
             try:
-                notification = self.notification_queue.get(timeout=1.0)
                 self.check_registrations()
 
-                for pusher in self.web_pushers[notification.user]:
-                    endpoint = pusher.subscription_info["endpoint"]
-                    headers = self.claim_headers[
-                        endpoint[: endpoint.index("/", 10)]
-                    ].copy()
-                    headers["urgency"] = "high"
-
-                    resp = pusher.send(
-                        headers=headers,
-                        ttl=notification.ttl,
-                        data=json.dumps(
-                            {
-                                "title": notification.title,
-                                "message": notification.message,
-                                "direct_url": notification.direct_url,
-                                "image": notification.image,
-                                "id": notification.payload.get("after", {}).get(
-                                    "id", ""
+                # send to the endpoints of all users in parallel so a slow
+                # push service does not block all other subscriptions
+                sends: list[tuple[PushNotification, Future]] = []
+                for notification in notifications:
+                    # the user may have been deleted in the meantime
+                    pushers = self.web_pushers.get(notification.user)
+                    if not pushers:
+                        continue
+
+                    data = notification.data or self._encode_payload(notification)
+
+                    for entry in pushers:
+                        sends.append(
+                            (
+                                notification,
+                                self.send_pool.submit(
+                                    self._send_to_pusher, entry, notification, data
                                 ),
-                                "type": notification.notification_type,
-                            }
-                        ),
-                        timeout=10,
-                    )
+                            )
+                        )
 
-                    if resp.status_code in (404, 410):
+                for notification, future in sends:
+                    endpoint, status_code = future.result()
+
+                    if status_code is None:
+                        continue
+
+                    if status_code in (404, 410):
                         self.expired_subs.setdefault(notification.user, []).append(
                             endpoint
                         )
                         logger.debug(
-                            f"Notification endpoint expired for {notification.user}, received {resp.status_code}"
+                            f"Notification endpoint expired for {notification.user}, received {status_code}"
                         )
-                    elif resp.status_code != 201:
+                    elif status_code != 201:
                         logger.warning(
-                            f"Failed to send notification to {notification.user} :: {resp.status_code}"
+                            f"Failed to send notification to {notification.user} :: {status_code}"
                         )
 
-            except queue.Empty:
-                continue
-            except Exception as e:
-                logger.error(f"Error processing notification: {str(e)}")
+                # remove expired subscriptions right after sending instead of
+                # on the dispatcher thread for every alert
+                self.cleanup_registrations()
+
+            except Exception:
+                logger.exception("Error processing notification")
 
-    def _get_dynamic_weight_factor(self, camera: str, base_weight_factor: float) -> float:
+    def _get_dynamic_weight_factor(
+        self,
+        camera: str,
+        base_weight_factor: float,
+        clock: WeightClock,
+        normalized_counts: Optional[np.ndarray] = None,
+    ) -> float:
         """Berechnet einen dynamischen Gewichtsfaktor basierend auf verschiedenen Faktoren."""
-        # Verwende UTC für konsistente Berechnungen, aber lokale Zeit für Tageszeit-Logik
-        now = datetime.datetime.now()
-        hour = now.hour
-        weekday = now.weekday()  # 0=Montag, 6=Sonntag
+        # Ohne Basis-Faktor bleibt jeder Modifikator wirkungslos
+        if base_weight_factor == 0.0:
+            return 0.0
+
+        # Lokale Zeit für Tageszeit-Logik
+        hour = clock.hour
+        weekday = clock.weekday
         
         # Basis-Faktor
         dynamic_factor = base_weight_factor
@@ -396,10 +742,15 @@ class WebPushClient(Communicator):
         dynamic_factor *= weekday_modifier
         
         # 3. Selbstregulierung: Berücksichtige die aktuelle Wirksamkeit des Gewichtssystems
-        current_weight = self._get_normalized_weight_count(camera, hour)
-        base_cooldown = self.config.cameras[camera].notifications.cooldown
+        weight_config = self.camera_weight_configs[camera]
+        # Normalisierte Anzahlen einmal für alle Buckets berechnen, Modifikator
+        # 3 und 4 lesen daraus nur noch einzelne Stunden
+        if normalized_counts is None:
+            normalized_counts = self._get_normalized_weight_counts(camera, clock)
+        current_weight = int(normalized_counts[hour])
+        base_cooldown = weight_config.cooldown
         current_cooldown_multiplier = 1 + current_weight * base_weight_factor
-        current_effective_cooldown = base_cooldown * min(current_cooldown_multiplier, self.config.cameras[camera].notifications.weight_max_factor)
+        current_effective_cooldown = base_cooldown * min(current_cooldown_multiplier, weight_config.weight_max_factor)
         
         # Wenn der aktuelle Cooldown bereits hoch ist, reduziere den Faktor moderater
         # Konfigurierbare Schwellwerte für bessere Kontrolle
@@ -417,10 +768,11 @@ class WebPushClient(Communicator):
         dynamic_factor *= self_regulation_modifier
         
         # 4. Gesamtaktivität der Kamera in den letzten Stunden (angepasst)
-        total_recent_notifications = 0
-        for h in range(max(0, hour-3), hour+1):  # Letzte 3-4 Stunden
-            slot = h % self.config.cameras[camera].notifications.weight_time_slots
-            total_recent_notifications += self._get_normalized_weight_count(camera, slot)
+        # Letzte 3-4 Stunden
+        recent_slots = [
+            h % weight_config.weight_time_slots for h in range(max(0, hour - 3), hour + 1)
+        ]
+        total_recent_notifications = int(normalized_counts[recent_slots].sum())
         
         # Berücksichtige auch hier die Selbstregulierung
         if total_recent_notifications > 10:
@@ -435,7 +787,7 @@ class WebPushClient(Communicator):
         dynamic_factor *= activity_modifier
         
         # 5. Zeit seit letzter Notification für diese Kamera
-        last_notification_age = now.timestamp() - self.last_camera_notification_time[camera]
+        last_notification_age = clock.timestamp - self.last_camera_notification_time[camera]
         if last_notification_age < 300:  # Weniger als 5 Minuten
             recency_modifier = 1.3
         elif last_notification_age < 3600:  # Weniger als 1 Stunde
@@ -462,34 +814,47 @@ class WebPushClient(Communicator):
         
         return final_factor
 
-    def _get_weighted_cooldown(self, camera: str) -> float:
+    def _get_weighted_cooldown(
+        self,
+        camera: str,
+        clock: WeightClock,
+        normalized_counts: Optional[np.ndarray] = None,
+    ) -> float:
         """Berechnet die gewichtete Cooldown-Zeit für die aktuelle Stunde."""
-        base_cooldown = self.config.cameras[camera].notifications.cooldown
-        hour = datetime.datetime.now().hour
-        # Verwende normalisierte Gewichte (Bucket-Wert minus Minimum aller Buckets)
-        weight = self._get_normalized_weight_count(camera, hour)
-        
-        # Verwende den dynamischen Gewichtsfaktor
-        base_weight_factor = self.config.cameras[camera].notifications.weight_factor
-        dynamic_weight_factor = self._get_dynamic_weight_factor(camera, base_weight_factor)
-        
-        weight_max_factor = self.config.cameras[camera].notifications.weight_max_factor
-        weight_time_slots = self.config.cameras[camera].notifications.weight_time_slots
-        
-        # Berechne den Multiplikator mit dem dynamischen Faktor
-        multiplier = 1 + weight * dynamic_weight_factor
-        # Begrenze den Multiplikator auf das Maximum
-        multiplier = min(multiplier, weight_max_factor)
-        
-        # Berechne die gewichtete Cooldown-Zeit
-        weighted_cooldown = base_cooldown * multiplier
+        weight_config = self.camera_weight_configs[camera]
+        base_cooldown = weight_config.cooldown
+
+        if weight_config.weight_factor == 0.0:
+            # Gewichtung deaktiviert, Normalisierung und dynamischer Faktor
+            # würden ohnehin einen Multiplikator von 1 ergeben
+            weighted_cooldown: float = base_cooldown
+        else:
+            # Verwende normalisierte Gewichte (Bucket-Wert minus Minimum aller Buckets),
+            # einmal berechnet und mit dem dynamischen Faktor geteilt
+            if normalized_counts is None:
+                normalized_counts = self._get_normalized_weight_counts(camera, clock)
+            weight = int(normalized_counts[clock.hour])
+
+            # Verwende den dynamischen Gewichtsfaktor
+            base_weight_factor = weight_config.weight_factor
+            dynamic_weight_factor = self._get_dynamic_weight_factor(
+                camera, base_weight_factor, clock, normalized_counts
+            )
+
+            weight_max_factor = weight_config.weight_max_factor
+
+            # Berechne den Multiplikator mit dem dynamischen Faktor
+            multiplier = 1 + weight * dynamic_weight_factor
+            # Begrenze den Multiplikator auf das Maximum
+            multiplier = min(multiplier, weight_max_factor)
+
+            # Berechne die gewichtete Cooldown-Zeit
+            weighted_cooldown = base_cooldown * multiplier
         
         # Berechne die maximale sinnvolle Cooldown-Zeit basierend auf der Bucket-Größe
         # Bei 24 time_slots = 24 Stunden am Tag = 3600 Sekunden pro Bucket
-        seconds_per_bucket = 86400 / weight_time_slots  # 86400 = Sekunden pro Tag
-        
         # Intelligentere Begrenzung: berücksichtige sowohl Bucket-Größe als auch Base-Cooldown
-        bucket_limit = seconds_per_bucket * 0.8  # 80% der Bucket-Zeit als obere Grenze
+        bucket_limit = weight_config.seconds_per_bucket * 0.8  # 80% der Bucket-Zeit als obere Grenze
         reasonable_minimum = base_cooldown * 0.5  # Mindestens 50% der Base-Cooldown
         max_reasonable_cooldown = max(bucket_limit, reasonable_minimum)
         
@@ -503,14 +868,13 @@ class WebPushClient(Communicator):
         
         return final_cooldown
 
-    def _within_cooldown(self, camera: str) -> bool:
-        now = datetime.datetime.now().timestamp()
+    def _within_cooldown(self, camera: str, clock: WeightClock) -> bool:
+        now = clock.timestamp
+        
+        weight_config = self.camera_weight_configs[camera]
         
         # Überprüfe ob kameraspezifische gewichtsbasierte Cooldown aktiviert ist
-        camera_weight_enabled = (
-            hasattr(self.config.cameras[camera].notifications, 'weight_factor') and
-            self.config.cameras[camera].notifications.weight_factor > 0
-        )
+        camera_weight_enabled = weight_config.weight_factor > 0
         
         # Globaler Cooldown - nur wenn kameraspezifische Cooldown NICHT aktiviert ist
         if not camera_weight_enabled and now - self.last_notification_time < self.config.notifications.cooldown:
@@ -519,12 +883,22 @@ class WebPushClient(Communicator):
             )
             return True
         # Kamera-spezifischer gewichteter Cooldown
-        cooldown = self._get_weighted_cooldown(camera)
+        cooldown = self._get_weighted_cooldown(camera, clock)
         if now - self.last_camera_notification_time[camera] < cooldown:
-            current_weight = self._get_normalized_weight_count(camera, datetime.datetime.now().hour)
-            base_weight_factor = self.config.cameras[camera].notifications.weight_factor
-            dynamic_weight_factor = self._get_dynamic_weight_factor(camera, base_weight_factor)
-            weight_max_factor = self.config.cameras[camera].notifications.weight_max_factor
+            # Die Gewichts-Details werden nur für das Debug-Log berechnet
+            if not logger.isEnabledFor(logging.DEBUG):
+                return True
+
+            if not camera_weight_enabled:
+                logger.debug(
+                    f"Skipping notification for {camera} - in camera-specific cooldown period ({cooldown:.2f}s)"
+                )
+                return True
+
+            current_weight = self._get_normalized_weight_count(camera, clock.hour, clock)
+            base_weight_factor = weight_config.weight_factor
+            dynamic_weight_factor = self._get_dynamic_weight_factor(camera, base_weight_factor, clock)
+            weight_max_factor = weight_config.weight_max_factor
             theoretical_multiplier = 1 + current_weight * dynamic_weight_factor
             actual_multiplier = min(theoretical_multiplier, weight_max_factor)
             capped = theoretical_multiplier > weight_max_factor
@@ -539,146 +913,154 @@ class WebPushClient(Communicator):
             return True
         return False
 
-    def _get_active_weights(self, camera: str, hour: int) -> list[float]:
+    def _log_weight_state(self, kind: str, camera: str, clock: WeightClock) -> None:
+        """Protokolliert Gewicht und Cooldown einer Kamera nach dem Senden."""
+        current_weight = self._get_normalized_weight_count(camera, clock.hour, clock)
+        adjusted_cooldown = self._get_weighted_cooldown(camera, clock)
+        weight_config = self.camera_weight_configs[camera]
+        weight_factor = weight_config.weight_factor
+        weight_max_factor = weight_config.weight_max_factor
+        theoretical_multiplier = 1 + current_weight * weight_factor
+        actual_multiplier = min(theoretical_multiplier, weight_max_factor)
+        capped = theoretical_multiplier > weight_max_factor
+        logger.debug(f"{kind} notification sent for {camera} - normalized weight: {current_weight}, adjusted cooldown: {adjusted_cooldown:.2f}s, multiplier: {actual_multiplier:.2f}{'[CAPPED]' if capped else ''}")
+
+    def _get_active_weights(self, camera: str, hour: int, clock: WeightClock) -> array:
         """Gibt alle noch aktiven (nicht abgelaufenen) Gewichte für eine Kamera und Stunde zurück."""
-        now = datetime.datetime.now().timestamp()
-        decay_days = self.config.cameras[camera].notifications.weight_decay_days
-        decay_seconds = decay_days * 86400
-        cutoff_time = now - decay_seconds
-        
-        # Filtere abgelaufene Timestamps heraus
-        active_weights = [
-            timestamp for timestamp in self.camera_weight_queues[camera][hour]
-            if timestamp > cutoff_time
-        ]
+        cutoff_time = clock.timestamp - self.camera_weight_configs[camera].weight_decay_seconds
         
-        # Aktualisiere die Queue, entferne abgelaufene Einträge
-        self.camera_weight_queues[camera][hour] = active_weights
+        # Die Timestamps werden chronologisch angehängt, abgelaufene Einträge
+        # stehen also immer am Anfang und können per bisect abgeschnitten werden
+        bucket = self.camera_weight_queues[camera][hour]
+        if bucket and bucket[0] <= cutoff_time:
+            del bucket[: bisect.bisect_right(bucket, cutoff_time)]
+            # Markiere, dass Änderungen vorliegen, auch wenn nicht das Decay
+            # sondern eine Entscheidung oder die Statistik aufgeräumt hat
+            self.weights_changed.set()
         
-        return active_weights
+        return bucket
+
+    def _get_bucket_counts(self, camera: str, clock: WeightClock) -> np.ndarray:
+        """Gibt die Anzahl aktiver Gewichte pro Bucket einer Kamera zurück."""
+        # Bewusst kein separat mitgeführter Zähler: Dispatcher- und API-Thread
+        # räumen die Buckets ohne Lock auf, ein Cache könnte auseinanderlaufen
+        time_slots = self.camera_weight_configs[camera].weight_time_slots
+        return np.fromiter(
+            (len(self._get_active_weights(camera, h, clock)) for h in range(time_slots)),
+            dtype=np.int32,
+            count=time_slots,
+        )
+
+    def _get_normalized_weight_counts(
+        self,
+        camera: str,
+        clock: WeightClock,
+        bucket_counts: Optional[np.ndarray] = None,
+    ) -> np.ndarray:
+        """Gibt die normalisierten Gewichtsanzahlen aller Buckets einer Kamera zurück."""
+        if bucket_counts is None:
+            bucket_counts = self._get_bucket_counts(camera, clock)
+        active = bucket_counts > 0
+        non_zero_counts = bucket_counts[active]
 
-    def _get_normalized_weight_count(self, camera: str, hour: int) -> int:
-        """Gibt die normalisierte Anzahl der Gewichte zurück basierend auf Durchschnitt/Median."""
-        # Sammle alle aktiven Gewichte für alle Stunden dieser Kamera
-        all_bucket_counts = []
-        time_slots = self.config.cameras[camera].notifications.weight_time_slots
-        
-        for h in range(time_slots):
-            bucket_count = len(self._get_active_weights(camera, h))
-            all_bucket_counts.append(bucket_count)
-        
-        # Berechne den aktuellen Bucket-Wert
-        current_bucket_count = len(self._get_active_weights(camera, hour))
-        
-        # Verschiedene Normalisierungsansätze
-        non_zero_counts = [count for count in all_bucket_counts if count > 0]
-        
-        if not non_zero_counts:
-            return 0
-        
-        # Methode 1: Minimum der Non-Zero Buckets
-        min_non_zero = min(non_zero_counts)
-        
-        # Methode 2: Durchschnitt aller Buckets (einschließlich Nullen)
-        avg_all = sum(all_bucket_counts) / len(all_bucket_counts)
-        
-        # Methode 3: Median der Non-Zero Buckets
-        sorted_non_zero = sorted(non_zero_counts)
-        median_non_zero = sorted_non_zero[len(sorted_non_zero) // 2]
-        
         # Wähle den Baseline-Wert: verwende das Minimum der aktiven Buckets
         # aber nur wenn es mehr als 1 aktiver Bucket ist
-        if len(non_zero_counts) > 1:
-            baseline = min_non_zero
-        else:
-            baseline = 0
-        
+        baseline = non_zero_counts.min() if non_zero_counts.size > 1 else 0
+
+        # Normalisiere nur aktive Buckets, inaktive bleiben bei 0
+        return np.where(active, bucket_counts - baseline, 0)
+
+    def _get_normalized_weight_count(
+        self, camera: str, hour: int, clock: WeightClock
+    ) -> int:
+        """Gibt die normalisierte Anzahl der Gewichte für eine Stunde zurück."""
+        all_bucket_counts = self._get_bucket_counts(camera, clock)
+        current_bucket_count = int(all_bucket_counts[hour])
+
         # Normalisiere nur wenn der aktuelle Bucket aktiv ist
-        if current_bucket_count > 0:
-            normalized_count = max(0, current_bucket_count - baseline)
-        else:
-            normalized_count = 0
-        
+        if current_bucket_count == 0:
+            return 0
+
+        non_zero_counts = all_bucket_counts[all_bucket_counts > 0]
+        baseline = int(non_zero_counts.min()) if non_zero_counts.size > 1 else 0
+        normalized_count = current_bucket_count - baseline
+
         # Debug-Logging bei signifikanten Unterschieden
-        if current_bucket_count != normalized_count and current_bucket_count > 0:
+        if current_bucket_count != normalized_count:
             logger.debug(
                 f"Normalization for {camera}h{hour}: raw={current_bucket_count}, "
                 f"normalized={normalized_count}, baseline={baseline}, "
-                f"active_buckets={len(non_zero_counts)}"
+                f"active_buckets={non_zero_counts.size}"
             )
         
         return normalized_count
 
-    def _increase_weight(self, camera: str):
+    def _increase_weight(self, camera: str, clock: WeightClock):
         """Fügt einen neuen Gewichts-Timestamp für die aktuelle Stunde der Kamera hinzu."""
-        hour = datetime.datetime.now().hour
-        current_time = datetime.datetime.now().timestamp()
-        self.camera_weight_queues[camera][hour].append(current_time)
+        bucket = self.camera_weight_queues[camera][clock.hour]
+        bucket.append(clock.timestamp)
+        # Ein bereits eingetragener Bucket läuft mit seinem ältesten Gewicht
+        # früher ab, der neue Timestamp braucht dann keinen eigenen Eintrag
+        self._schedule_expiry(camera, clock.hour, bucket[0])
         # Markiere, dass Änderungen vorliegen - Speicherung erfolgt batch-weise
-        self.pending_weight_changes = True
-        
-        # Bei kritischen Situationen (viele Gewichte) sofort speichern
-        if len(self.camera_weight_queues[camera][hour]) % 10 == 0:
-            self._save_weights(force=True)
+        self.weights_changed.set()
 
-    def _decay_weights(self):
+    def _decay_weights(self, clock: WeightClock):
         """Entfernt automatisch abgelaufene Gewichte aus allen Queues."""
-        weights_changed = False
-        for camera in self.camera_weight_queues:
-            for hour in range(self.config.cameras[camera].notifications.weight_time_slots):
-                # _get_active_weights räumt automatisch abgelaufene Einträge auf
-                old_count = len(self.camera_weight_queues[camera][hour])
-                self._get_active_weights(camera, hour)
-                new_count = len(self.camera_weight_queues[camera][hour])
-                if old_count != new_count:
-                    weights_changed = True
-        
-        # Speichere nur wenn sich etwas geändert hat
-        if weights_changed:
-            self.pending_weight_changes = True
-            self._save_weights()
+        heap = self._expiry_heap
+        # Nur Buckets mit tatsächlich abgelaufenen Einträgen werden angefasst,
+        # _get_active_weights markiert dabei die Änderungen zum Speichern
+        while heap and heap[0][0] <= clock.timestamp:
+            _, camera, hour = heapq.heappop(heap)
+            self._expiry_scheduled.discard((camera, hour))
+            bucket = self.camera_weight_queues.get(camera, {}).get(hour)
+            if not bucket:
+                # bereits durch _get_active_weights aufgeräumt
+                continue
+            self._get_active_weights(camera, hour, clock)
+            # Der Bucket läuft erneut mit seinem nun ältesten Gewicht ab
+            if bucket:
+                self._schedule_expiry(camera, hour, bucket[0])
 
     def get_weight_statistics(self, camera: str) -> dict[str, Any]:
         """Gibt detaillierte Statistiken über Gewichte zurück für Debugging."""
         if camera not in self.camera_weight_queues:
             return {"error": f"Camera {camera} not found"}
         
-        now = datetime.datetime.now()
-        current_hour = now.hour
-        
-        # Aktuelle Gewichte sammeln (roh und normalisiert)
-        active_weights = self._get_active_weights(camera, current_hour)
-        normalized_current_weight = self._get_normalized_weight_count(camera, current_hour)
-        total_weights_24h = 0
-        total_normalized_weights_24h = 0
-        hourly_breakdown = {}
-        normalized_hourly_breakdown = {}
-        
-        for hour in range(24):
-            weights_for_hour = self._get_active_weights(camera, hour)
-            normalized_weights_for_hour = self._get_normalized_weight_count(camera, hour)
-            hourly_breakdown[hour] = len(weights_for_hour)
-            normalized_hourly_breakdown[hour] = normalized_weights_for_hour
-            total_weights_24h += len(weights_for_hour)
-            total_normalized_weights_24h += normalized_weights_for_hour
+        clock = WeightClock.now()
+        current_hour = clock.hour
+        
+        # Aktuelle Gewichte sammeln (roh und normalisiert), die Bucket-Anzahlen
+        # werden dafür nur einmal ermittelt
+        bucket_counts = self._get_bucket_counts(camera, clock)
+        normalized_counts = self._get_normalized_weight_counts(
+            camera, clock, bucket_counts
+        )
+        hourly_breakdown = dict(enumerate(bucket_counts.tolist()))
+        normalized_hourly_breakdown = dict(enumerate(normalized_counts.tolist()))
         
         # Cooldown-Berechnungen
-        base_cooldown = self.config.cameras[camera].notifications.cooldown
-        current_cooldown = self._get_weighted_cooldown(camera)
-        base_weight_factor = self.config.cameras[camera].notifications.weight_factor
-        dynamic_weight_factor = self._get_dynamic_weight_factor(camera, base_weight_factor)
+        weight_config = self.camera_weight_configs[camera]
+        base_cooldown = weight_config.cooldown
+        current_cooldown = self._get_weighted_cooldown(
+            camera, clock, normalized_counts
+        )
+        base_weight_factor = weight_config.weight_factor
+        dynamic_weight_factor = self._get_dynamic_weight_factor(
+            camera, base_weight_factor, clock, normalized_counts
+        )
         
         # Letzte Notification
         last_notification_time = self.last_camera_notification_time.get(camera, 0)
-        time_since_last = now.timestamp() - last_notification_time if last_notification_time > 0 else None
+        time_since_last = clock.timestamp - last_notification_time if last_notification_time > 0 else None
         
         return {
             "camera": camera,
             "current_hour": current_hour,
-            "active_weights_current_hour": len(active_weights),
-            "normalized_weight_current_hour": normalized_current_weight,
-            "total_weights_24h": total_weights_24h,
-            "total_normalized_weights_24h": total_normalized_weights_24h,
+            "active_weights_current_hour": hourly_breakdown.get(current_hour, 0),
+            "normalized_weight_current_hour": normalized_hourly_breakdown.get(current_hour, 0),
+            "total_weights_24h": int(bucket_counts.sum()),
+            "total_normalized_weights_24h": int(normalized_counts.sum()),
             "hourly_breakdown": hourly_breakdown,
             "normalized_hourly_breakdown": normalized_hourly_breakdown,
             "cooldown": {
@@ -694,7 +1076,7 @@ class WebPushClient(Communicator):
             "last_notification": {
                 "timestamp": last_notification_time if last_notification_time > 0 else None,
                 "seconds_ago": time_since_last,
-                "formatted": datetime.datetime.fromtimestamp(last_notification_time).strftime('%Y-%m-%d %H:%M:%S') if last_notification_time > 0 else None,
+                "formatted": _format_timestamp(int(last_notification_time)) if last_notification_time > 0 else None,
             },
             "next_notification_allowed_in": max(0, current_cooldown - (time_since_last or float('inf'))),
         }
@@ -703,21 +1085,19 @@ class WebPushClient(Communicator):
         if not self.config.notifications.email:
             return
 
-        self.check_registrations()
-
         logger.debug("Sending test notification")
 
-        for user in self.web_pushers:
-            self.send_push_notification(
-                user=user,
-                payload={},
-                title="Test Notification",
-                message="This is a test notification from Frigate.",
-                direct_url="/",
-                notification_type="test",
-            )
+        self._send_push_notification_to_all(
+            payload={},
+            title="Test Notification",
+            message="This is a test notification from Frigate.",
+            direct_url="/",
+            notification_type="test",
+        )
 
-    def send_alert(self, payload: dict[str, Any]) -> None:
+    def send_alert(
+        self, payload: dict[str, Any], clock: Optional[WeightClock] = None
+    ) -> None:
         if (
             not self.config.notifications.email
             or payload["after"]["severity"] != "alert"
@@ -725,38 +1105,29 @@ class WebPushClient(Communicator):
             return
 
         camera: str = payload["after"]["camera"]
-        camera_name: str = getattr(
-            self.config.cameras[camera], "friendly_name", None
-        ) or titlecase(camera.replace("_", " "))
-        current_time = datetime.datetime.now().timestamp()
+        camera_name = self.camera_display_names[camera]
+        if clock is None:
+            clock = WeightClock.now()
+        current_time = clock.timestamp
 
-        self._decay_weights()
-        if self._within_cooldown(camera):
+        self._decay_weights(clock)
+        if self._within_cooldown(camera, clock):
             return
-        self._increase_weight(camera)
+        self._increase_weight(camera, clock)
         
         # Debug-Information über aktuelle Gewichte
-        hour = datetime.datetime.now().hour
-        current_weight = self._get_normalized_weight_count(camera, hour)
-        adjusted_cooldown = self._get_weighted_cooldown(camera)
-        weight_factor = self.config.cameras[camera].notifications.weight_factor
-        weight_max_factor = self.config.cameras[camera].notifications.weight_max_factor
-        theoretical_multiplier = 1 + current_weight * weight_factor
-        actual_multiplier = min(theoretical_multiplier, weight_max_factor)
-        capped = theoretical_multiplier > weight_max_factor
-        logger.debug(f"Alert notification sent for {camera} - normalized weight: {current_weight}, adjusted cooldown: {adjusted_cooldown:.2f}s, multiplier: {actual_multiplier:.2f}{'[CAPPED]' if capped else ''}")
-
-        self.check_registrations()
+        if logger.isEnabledFor(logging.DEBUG):
+            self._log_weight_state("Alert", camera, clock)
 
         state = payload["type"]
 
         # Don't notify if message is an update and important fields don't have an update
+        before_data = payload["before"]["data"]
+        after_data = payload["after"]["data"]
         if (
             state == "update"
-            and len(payload["before"]["data"]["objects"])
-            == len(payload["after"]["data"]["objects"])
-            and len(payload["before"]["data"]["zones"])
-            == len(payload["after"]["data"]["zones"])
+            and before_data["objects"] == after_data["objects"]
+            and before_data["zones"] == after_data["zones"]
         ):
             logger.debug(
                 f"Skipping notification for {camera} - message is an update and important fields don't have an update"
@@ -767,16 +1138,19 @@ class WebPushClient(Communicator):
         self.last_notification_time = current_time
 
         reviewId = payload["after"]["id"]
-        sorted_objects: set[str] = set()
-
-        for obj in payload["after"]["data"]["objects"]:
-            if "-verified" not in obj:
-                sorted_objects.add(obj)
-
-        sorted_objects.update(payload["after"]["data"]["sub_labels"])
+        sorted_objects = sorted(
+            {
+                *(
+                    obj
+                    for obj in payload["after"]["data"]["objects"]
+                    if "-verified" not in obj
+                ),
+                *payload["after"]["data"]["sub_labels"],
+            }
+        )
 
-        title = f"{titlecase(', '.join(sorted_objects).replace('_', ' '))}{' was' if state == 'end' else ''} detected in {titlecase(', '.join(payload['after']['data']['zones']).replace('_', ' '))}"
-        image = f"{payload['after']['thumb_path'].replace('/media/frigate', '')}"
+        title = f"{_display_label(', '.join(sorted_objects))}{' was' if state == 'end' else ''} detected in {_display_label(', '.join(payload['after']['data']['zones']))}"
+        image = payload["after"]["thumb_path"].removeprefix("/media/frigate")
         ended = state == "end" or state == "genai"
 
         if state == "genai" and payload["after"]["data"]["metadata"]:
@@ -795,46 +1169,35 @@ class WebPushClient(Communicator):
 
         logger.debug(f"Sending push notification for {camera}, review ID {reviewId}")
 
-        for user in self.web_pushers:
-            self.send_push_notification(
-                user=user,
-                payload=payload,
-                title=title,
-                message=message,
-                direct_url=direct_url,
-                image=image,
-                ttl=ttl,
-            )
-
-        self.cleanup_registrations()
+        self._send_push_notification_to_all(
+            payload=payload,
+            title=title,
+            message=message,
+            direct_url=direct_url,
+            image=image,
+            ttl=ttl,
+        )
 
-    def send_trigger(self, payload: dict[str, Any]) -> None:
+    def send_trigger(
+        self, payload: dict[str, Any], clock: Optional[WeightClock] = None
+    ) -> None:
         if not self.config.notifications.email:
             return
 
         camera: str = payload["camera"]
-        camera_name: str = getattr(
-            self.config.cameras[camera], "friendly_name", None
-        ) or titlecase(camera.replace("_", " "))
-        current_time = datetime.datetime.now().timestamp()
+        camera_name = self.camera_display_names[camera]
+        if clock is None:
+            clock = WeightClock.now()
+        current_time = clock.timestamp
 
-        self._decay_weights()
-        if self._within_cooldown(camera):
+        self._decay_weights(clock)
+        if self._within_cooldown(camera, clock):
             return
-        self._increase_weight(camera)
+        self._increase_weight(camera, clock)
         
         # Debug-Information über aktuelle Gewichte
-        hour = datetime.datetime.now().hour
-        current_weight = self._get_normalized_weight_count(camera, hour)
-        adjusted_cooldown = self._get_weighted_cooldown(camera)
-        weight_factor = self.config.cameras[camera].notifications.weight_factor
-        weight_max_factor = self.config.cameras[camera].notifications.weight_max_factor
-        theoretical_multiplier = 1 + current_weight * weight_factor
-        actual_multiplier = min(theoretical_multiplier, weight_max_factor)
-        capped = theoretical_multiplier > weight_max_factor
-        logger.debug(f"Trigger notification sent for {camera} - normalized weight: {current_weight}, adjusted cooldown: {adjusted_cooldown:.2f}s, multiplier: {actual_multiplier:.2f}{'[CAPPED]' if capped else ''}")
-
-        self.check_registrations()
+        if logger.isEnabledFor(logging.DEBUG):
+            self._log_weight_state("Trigger", camera, clock)
 
         self.last_camera_notification_time[camera] = current_time
         self.last_notification_time = current_time
@@ -845,7 +1208,7 @@ class WebPushClient(Communicator):
         score = payload["score"]
 
         title = f"{name.replace('_', ' ')} triggered on {camera_name}"
-        message = f"{titlecase(trigger_type)} trigger fired for {camera_name} with score {score:.2f}"
+        message = f"{_display_label(trigger_type)} trigger fired for {camera_name} with score {score:.2f}"
         image = f"clips/triggers/{camera}/{event_id}.webp"
 
         direct_url = f"/explore?event_id={event_id}"
@@ -855,21 +1218,26 @@ class WebPushClient(Communicator):
             f"Sending push notification for {camera_name}, trigger name {name}"
         )
 
-        for user in self.web_pushers:
-            self.send_push_notification(
-                user=user,
-                payload=payload,
-                title=title,
-                message=message,
-                direct_url=direct_url,
-                image=image,
-                ttl=ttl,
-            )
-
-        self.cleanup_registrations()
+        self._send_push_notification_to_all(
+            payload=payload,
+            title=title,
+            message=message,
+            direct_url=direct_url,
+            image=image,
+            ttl=ttl,
+        )
 
     def stop(self) -> None:
         logger.info("Closing notification queue")
-        # Speichere Gewichte vor dem Herunterfahren (erzwungen)
-        self._save_weights(force=True)
+        # notifications that are already queued are still delivered
+        self.notification_queue.put(None)
         self.notification_thread.join()
+        self.send_pool.shutdown(wait=True)
+        self.session.close()
+        # Speichere ausstehende Gewichte vor dem Herunterfahren, das Event
+        # weckt außerdem den wartenden Speicher-Thread
+        weights_pending = self.weights_changed.is_set()
+        self.weights_changed.set()
+        self.weights_thread.join()
+        if weights_pending:
+            self._save_weights()
@@ -1,11 +1,15 @@
 from typing import Dict, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import ConfigDict, Field, PrivateAttr, field_validator, model_validator
 
+from ..base import FrigateBaseModel
 
-class CameraActionConfig(BaseModel):
+
+class CameraActionConfig(FrigateBaseModel):
     """Configuration for a single camera action."""
-    
+
+    model_config = ConfigDict(frozen=True)
+
     name: str = Field(..., description="Display name for the action")
     url: str = Field(..., description="HTTP endpoint to call")
     method: str = Field(default="POST", description="HTTP method")
@@ -14,8 +18,39 @@ class CameraActionConfig(BaseModel):
     icon: Optional[str] = Field(default=None, description="React icon name (e.g., 'FaLightbulb', 'FaBell')")
     standalone: bool = Field(default=False, description="Whether to display as standalone button instead of in dropdown")
 
+    @field_validator("method", mode="before")
+    @classmethod
+    def validate_method(cls, v):
+        if isinstance(v, str):
+            return v.upper()
+
+        return v
+
 
-class CameraActionsConfig(BaseModel):
+class CameraActionsConfig(FrigateBaseModel):
     """Configuration for camera actions."""
-    
+
+    # frozen so the name index can never go stale through assignment
+    model_config = ConfigDict(frozen=True)
+
     actions: list[CameraActionConfig] = Field(default_factory=list)
+    _actions_by_name: dict[str, CameraActionConfig] = PrivateAttr(default_factory=dict)
+    _indexed_actions: Optional[list[CameraActionConfig]] = PrivateAttr(default=None)
+
+    @property
+    def actions_by_name(self) -> dict[str, CameraActionConfig]:
+        # model_copy(update=...) skips validation and copies the private index
+        # of the original, so rebuild it if the actions list was replaced
+        if self._indexed_actions is not self.actions:
+            self.index_actions()
+
+        return self._actions_by_name
+
+    @model_validator(mode="after")
+    def index_actions(self):
+        # reversed so the first action wins if names are duplicated
+        self._actions_by_name = {
+            action.name: action for action in reversed(self.actions)
+        }
+        self._indexed_actions = self.actions
+        return self
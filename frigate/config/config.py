@@ -421,11 +421,30 @@ class FrigateConfig(FrigateBaseModel):
     )
 
     _plus_api: PlusApi
+    _notification_enabled_cameras: frozenset[str] = frozenset()
 
     @property
     def plus_api(self) -> PlusApi:
         return self._plus_api
 
+    @property
+    def notification_enabled_cameras(self) -> frozenset[str]:
+        """Names of enabled cameras that have notifications enabled."""
+        return self._notification_enabled_cameras
+
+    @property
+    def notifications_any_enabled(self) -> bool:
+        """If notifications are enabled globally or for any camera."""
+        return self.notifications.enabled or bool(self._notification_enabled_cameras)
+
+    def update_notification_state(self) -> None:
+        """Recompute the cached notification state after a runtime toggle."""
+        self._notification_enabled_cameras = frozenset(
+            name
+            for name, camera in self.cameras.items()
+            if camera.enabled and camera.notifications.enabled
+        )
+
     @model_validator(mode="after")
     def post_validation(self, info: ValidationInfo) -> Self:
         # Load plus api from context, if possible.
@@ -731,6 +750,7 @@ class FrigateConfig(FrigateBaseModel):
                     f"Role '{role}' references non-existent cameras: {invalid_cameras}. "
                 )
 
+        self.update_notification_state()
         return self
 
     @field_validator("cameras")
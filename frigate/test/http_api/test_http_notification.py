@@ -0,0 +1,241 @@
+import asyncio
+import time
+from unittest.mock import MagicMock, patch
+
+from fastapi.testclient import TestClient
+
+from frigate.api import notification
+from frigate.models import User
+from frigate.test.http_api.base_http_test import BaseTestHttp
+
+ADMIN_HEADERS = {"remote-user": "admin", "remote-role": "admin"}
+
+
+class TestHttpNotification(BaseTestHttp):
+    def setUp(self):
+        super().setUp([User])
+        User.insert(
+            username="admin",
+            role="admin",
+            password_hash="",
+            notification_tokens=[],
+        ).execute()
+
+    def create_notification_app(self):
+        self.minimal_config["notifications"] = {
+            "enabled": True,
+            "email": "admin@example.com",
+        }
+        app = super().create_app()
+        self.web_push_client = MagicMock()
+        self.web_push_client.web_pushers = {"admin": [], "viewer": []}
+        app.dispatcher = MagicMock(web_push_client=self.web_push_client)
+        return app
+
+    def sent_notifications(self) -> list[dict]:
+        return [
+            call.kwargs
+            for call in self.web_push_client.send_push_notification.call_args_list
+        ]
+
+    def register(self, client: TestClient, sub: dict):
+        return client.post(
+            "/notifications/register",
+            json={"sub": sub},
+            headers=ADMIN_HEADERS,
+        )
+
+    def test_register_notifications(self):
+        app = super().create_app()
+        sub = {
+            "endpoint": "https://push.example.com/abc",
+            "keys": {"p256dh": "key1", "auth": "auth1"},
+        }
+
+        with TestClient(app) as client:
+            response = self.register(client, sub)
+            assert response.status_code == 200
+            assert User.get_by_id("admin").notification_tokens == [sub]
+
+    def test_register_notifications_duplicate(self):
+        app = super().create_app()
+        sub = {
+            "endpoint": "https://push.example.com/abc",
+            "keys": {"p256dh": "key1", "auth": "auth1"},
+        }
+
+        with TestClient(app) as client:
+            assert self.register(client, sub).status_code == 200
+            assert self.register(client, sub).status_code == 200
+            assert User.get_by_id("admin").notification_tokens == [sub]
+
+    def test_register_notifications_replaces_rotated_keys(self):
+        app = super().create_app()
+        other = {
+            "endpoint": "https://push.example.com/other",
+            "keys": {"p256dh": "key0", "auth": "auth0"},
+        }
+        old_sub = {
+            "endpoint": "https://push.example.com/abc",
+            "keys": {"p256dh": "key1", "auth": "auth1"},
+        }
+        new_sub = {
+            "endpoint": "https://push.example.com/abc",
+            "keys": {"p256dh": "key2", "auth": "auth2"},
+        }
+
+        with TestClient(app) as client:
+            assert self.register(client, other).status_code == 200
+            assert self.register(client, old_sub).status_code == 200
+            assert self.register(client, new_sub).status_code == 200
+            assert User.get_by_id("admin").notification_tokens == [other, new_sub]
+
+    def test_register_notifications_invalid_subscription(self):
+        app = super().create_app()
+
+        with TestClient(app) as client:
+            assert self.register(client, "not a subscription").status_code == 400
+            assert self.register(client, {"keys": {}}).status_code == 400
+            assert self.register(client, {"endpoint": 42}).status_code == 400
+            assert User.get_by_id("admin").notification_tokens == []
+
+    def test_register_notifications_unknown_user(self):
+        app = super().create_app()
+
+        with TestClient(app) as client:
+            response = client.post(
+                "/notifications/register",
+                json={"sub": {"endpoint": "https://push.example.com/abc"}},
+                headers={"remote-user": "nobody", "remote-role": "admin"},
+            )
+            assert response.status_code == 404
+
+    def test_send_custom_notification_get(self):
+        app = self.create_notification_app()
+
+        with TestClient(app) as client:
+            response = client.get(
+                "/notifications/send",
+                params={"title": "Hello", "message": "World", "ttl": 60},
+                headers=ADMIN_HEADERS,
+            )
+            assert response.status_code == 200
+            assert response.json()["success"]
+
+        sent = self.sent_notifications()
+        assert [n["user"] for n in sent] == ["admin", "viewer"]
+        assert sent[0]["title"] == "Hello"
+        assert sent[0]["message"] == "World"
+        assert sent[0]["direct_url"] == "/"
+        assert sent[0]["ttl"] == 60
+        assert sent[0]["payload"] == {"type": "custom", "sender": "admin"}
+
+    def test_send_custom_notification_post_body(self):
+        app = self.create_notification_app()
+
+        with TestClient(app) as client:
+            response = client.post(
+                "/notifications/send",
+                json={
+                    "title": "Hello",
+                    "message": "World",
+                    "direct_url": "/review",
+                },
+                headers=ADMIN_HEADERS,
+            )
+            assert response.status_code == 200
+
+        sent = self.sent_notifications()
+        assert len(sent) == 2
+        assert sent[0]["title"] == "Hello"
+        assert sent[0]["message"] == "World"
+        assert sent[0]["direct_url"] == "/review"
+
+    def test_send_custom_notification_query_overrides_body(self):
+        app = self.create_notification_app()
+
+        with TestClient(app) as client:
+            response = client.post(
+                "/notifications/send",
+                params={"title": "From query"},
+                json={"title": "From body", "message": "Body message"},
+                headers=ADMIN_HEADERS,
+            )
+            assert response.status_code == 200
+
+        sent = self.sent_notifications()
+        assert sent[0]["title"] == "From query"
+        assert sent[0]["message"] == "Body message"
+
+    def test_send_custom_notification_too_long(self):
+        app = self.create_notification_app()
+
+        with TestClient(app) as client:
+            response = client.get(
+                "/notifications/send",
+                params={"title": "a" * 201, "message": "World"},
+                headers=ADMIN_HEADERS,
+            )
+            assert response.status_code == 422
+
+            response = client.post(
+                "/notifications/send",
+                params={"message": "m" * 501},
+                json={"title": "Hello", "message": "World"},
+                headers=ADMIN_HEADERS,
+            )
+            assert response.status_code == 422
+
+            response = client.post(
+                "/notifications/send",
+                json={"title": "Hello", "message": "m" * 501},
+                headers=ADMIN_HEADERS,
+            )
+            assert response.status_code == 422
+
+        self.web_push_client.send_push_notification.assert_not_called()
+
+    def test_weight_statistics_cache(self):
+        app = self.create_notification_app()
+        self.web_push_client.get_weight_statistics.return_value = {
+            "camera": "front_door"
+        }
+
+        with (
+            TestClient(app) as client,
+            patch.object(
+                notification.asyncio, "to_thread", wraps=asyncio.to_thread
+            ) as to_thread,
+        ):
+            response = client.get("/notifications/weight-stats/front_door")
+            assert response.status_code == 200
+            assert response.json() == {"camera": "front_door"}
+            assert to_thread.call_count == 1
+
+            # a cache hit does not compute the stats again
+            response = client.get("/notifications/weight-stats/front_door")
+            assert response.status_code == 200
+            assert to_thread.call_count == 1
+
+            # once the entry has expired the stats are computed again
+            cache = app.state.weight_stats_cache
+            cache["front_door"] = (time.monotonic() - 1, cache["front_door"][1])
+            response = client.get("/notifications/weight-stats/front_door")
+            assert response.status_code == 200
+            assert to_thread.call_count == 2
+
+        assert self.web_push_client.get_weight_statistics.call_count == 2
+
+    def test_weight_statistics_cache_per_app(self):
+        for _ in range(2):
+            # every app starts with an empty cache and computes its own stats
+            app = self.create_notification_app()
+            self.web_push_client.get_weight_statistics.return_value = {
+                "camera": "front_door"
+            }
+
+            with TestClient(app) as client:
+                response = client.get("/notifications/weight-stats/front_door")
+                assert response.status_code == 200
+
+            self.web_push_client.get_weight_statistics.assert_called_once()
@@ -1531,6 +1531,116 @@ class TestConfig(unittest.TestCase):
 
         self.assertRaises(ValueError, lambda: FrigateConfig(**config))
 
+    def test_notification_state_follows_camera_toggles(self):
+        config = {
+            "cameras": {
+                "back": {"notifications": {"enabled": True}},
+                "front": {
+                    "ffmpeg": {
+                        "inputs": [
+                            {"path": "rtsp://10.0.0.2:554/video", "roles": ["detect"]}
+                        ]
+                    },
+                    "detect": {
+                        "height": 1080,
+                        "width": 1920,
+                        "fps": 5,
+                    },
+                },
+            }
+        }
+
+        frigate_config = FrigateConfig(**deep_merge(config, self.minimal))
+        assert frigate_config.notification_enabled_cameras == {"back"}
+        assert frigate_config.notifications_any_enabled
+
+        frigate_config.cameras["front"].notifications.enabled = True
+        frigate_config.update_notification_state()
+        assert frigate_config.notification_enabled_cameras == {"back", "front"}
+
+        frigate_config.cameras["back"].enabled = False
+        frigate_config.update_notification_state()
+        assert frigate_config.notification_enabled_cameras == {"front"}
+        assert frigate_config.notifications_any_enabled
+
+        frigate_config.cameras["front"].notifications.enabled = False
+        frigate_config.update_notification_state()
+        assert frigate_config.notification_enabled_cameras == frozenset()
+        assert not frigate_config.notifications_any_enabled
+
+        # globally enabled notifications do not depend on any camera
+        frigate_config.notifications.enabled = True
+        assert frigate_config.notifications_any_enabled
+
+    def test_camera_actions_lookup(self):
+        config = {
+            "cameras": {
+                "back": {
+                    "actions": {
+                        "actions": [
+                            {"name": "light", "url": "http://light/on"},
+                            {
+                                "name": "siren",
+                                "url": "http://siren/on",
+                                "method": "put",
+                            },
+                            {"name": "light", "url": "http://other/on"},
+                        ]
+                    }
+                }
+            }
+        }
+
+        frigate_config = FrigateConfig(**deep_merge(config, self.minimal))
+        actions = frigate_config.cameras["back"].actions
+
+        assert set(actions.actions_by_name) == {"light", "siren"}
+        # the first action with a duplicated name wins
+        assert actions.actions_by_name["light"].url == "http://light/on"
+        assert actions.actions_by_name["light"].method == "POST"
+        assert actions.actions_by_name["siren"].method == "PUT"
+        assert "missing" not in actions.actions_by_name
+
+    def test_camera_actions_lookup_after_copy(self):
+        config = {
+            "cameras": {
+                "back": {
+                    "actions": {
+                        "actions": [{"name": "light", "url": "http://light/on"}]
+                    }
+                }
+            }
+        }
+
+        frigate_config = FrigateConfig(**deep_merge(config, self.minimal))
+        actions = frigate_config.cameras["back"].actions
+        siren = actions.actions[0].model_copy(update={"name": "siren"})
+        copied = actions.model_copy(update={"actions": [siren]})
+
+        assert set(copied.actions_by_name) == {"siren"}
+        assert set(actions.actions_by_name) == {"light"}
+
+    def test_fails_camera_action_unknown_key(self):
+        config = {
+            "cameras": {
+                "back": {
+                    "actions": {
+                        "actions": [
+                            {
+                                "name": "light",
+                                "url": "http://light/on",
+                                "timeout": 5,
+                            }
+                        ]
+                    }
+                }
+            }
+        }
+
+        self.assertRaises(
+            ValidationError, lambda: FrigateConfig(**deep_merge(config, self.minimal))
+        )
+
 
 if __name__ == "__main__":
     unittest.main(verbosity=2)
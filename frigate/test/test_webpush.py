@@ -0,0 +1,248 @@
+import os
+import queue
+import random
+import stat
+import tempfile
+import threading
+import unittest
+from array import array
+from unittest.mock import patch
+
+from frigate.comms.webpush import (
+    CameraWeightConfig,
+    PushNotification,
+    WebPushClient,
+    WeightClock,
+)
+from frigate.config.camera.notification import NotificationConfig
+
+DECAY_SECONDS = 86400
+
+
+def create_weight_client(cameras: list[str]) -> WebPushClient:
+    """Creates a client with only the weight tracking state initialized."""
+    client = WebPushClient.__new__(WebPushClient)
+    weight_config = CameraWeightConfig.from_config(
+        NotificationConfig(weight_decay_days=1)
+    )
+    client.camera_weight_configs = {camera: weight_config for camera in cameras}
+    client.camera_weight_queues = {
+        camera: {h: array("d") for h in range(weight_config.weight_time_slots)}
+        for camera in cameras
+    }
+    client.last_camera_notification_time = {camera: 0 for camera in cameras}
+    client.weights_changed = threading.Event()
+    client._rebuild_expiry_heap()
+    return client
+
+
+def clock_at(timestamp: float, hour: int) -> WeightClock:
+    return WeightClock(timestamp=timestamp, hour=hour, weekday=0)
+
+
+class TestWeightDecay(unittest.TestCase):
+    def test_decay_prunes_expired_weights(self):
+        client = create_weight_client(["front_door"])
+        start = 1_700_000_000.25
+
+        client._increase_weight("front_door", clock_at(start, 3))
+        client._increase_weight("front_door", clock_at(start + 10, 3))
+        client._increase_weight("front_door", clock_at(start + 20, 7))
+        client.weights_changed.clear()
+
+        # nothing has expired yet
+        client._decay_weights(clock_at(start + DECAY_SECONDS - 1, 3))
+        assert len(client.camera_weight_queues["front_door"][3]) == 2
+        assert len(client.camera_weight_queues["front_door"][7]) == 1
+        assert not client.weights_changed.is_set()
+
+        # only the first weight has expired
+        client._decay_weights(clock_at(start + DECAY_SECONDS + 5, 3))
+        assert list(client.camera_weight_queues["front_door"][3]) == [start + 10]
+        assert len(client.camera_weight_queues["front_door"][7]) == 1
+        assert client.weights_changed.is_set()
+
+        client._decay_weights(clock_at(start + DECAY_SECONDS + 30, 3))
+        assert len(client.camera_weight_queues["front_door"][3]) == 0
+        assert len(client.camera_weight_queues["front_door"][7]) == 0
+        assert client._expiry_heap == []
+
+    def test_decay_matches_full_scan(self):
+        cameras = ["front_door", "back_yard"]
+        client = create_weight_client(cameras)
+        rng = random.Random(42)
+        added: list[tuple[str, int, float]] = []
+        now = 1_700_000_000.0
+
+        for _ in range(500):
+            now += rng.uniform(0, 3 * 3600)
+
+            if rng.random() < 0.7:
+                camera = rng.choice(cameras)
+                hour = rng.randrange(24)
+                client._increase_weight(camera, clock_at(now, hour))
+                added.append((camera, hour, now))
+            else:
+                client._decay_weights(clock_at(now, 0))
+                cutoff = now - DECAY_SECONDS
+
+                for camera in cameras:
+                    for hour in range(24):
+                        expected = [
+                            ts
+                            for cam, h, ts in added
+                            if cam == camera and h == hour and ts > cutoff
+                        ]
+                        assert (
+                            list(client.camera_weight_queues[camera][hour])
+                            == expected
+                        )
+
+            # at most one heap entry per bucket, never one per weight
+            buckets = [(cam, h) for cam, h, _ in client._expiry_heap]
+            assert len(buckets) == len(set(buckets))
+            assert len(buckets) <= len(cameras) * 24
+
+    def test_bucket_counts_match_queues(self):
+        cameras = ["front_door", "back_yard"]
+        client = create_weight_client(cameras)
+        rng = random.Random(7)
+        now = 1_700_000_000.0
+
+        for _ in range(300):
+            now += rng.uniform(0, 3 * 3600)
+            clock = clock_at(now, rng.randrange(24))
+            camera = rng.choice(cameras)
+            action = rng.random()
+
+            if action < 0.6:
+                client._increase_weight(camera, clock)
+            elif action < 0.8:
+                client._decay_weights(clock)
+            else:
+                with patch.object(WeightClock, "now", return_value=clock):
+                    stats = client.get_weight_statistics(camera)
+
+                queues = client.camera_weight_queues[camera]
+                assert stats["hourly_breakdown"] == {
+                    h: len(queues[h]) for h in queues
+                }
+
+            cutoff = now - DECAY_SECONDS
+
+            for camera in cameras:
+                counts = client._get_bucket_counts(camera, clock_at(now, 0))
+                queues = client.camera_weight_queues[camera]
+
+                for hour, bucket in queues.items():
+                    assert counts[hour] == len(bucket)
+                    assert all(ts > cutoff for ts in bucket)
+
+                    # every bucket with weights is still scheduled to expire
+                    if bucket:
+                        assert (camera, hour) in client._expiry_scheduled
+
+
+class TestSaveWeights(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.client = create_weight_client(["front_door"])
+        self.client.weights_file = os.path.join(
+            self.tmp_dir.name, "notification_weights.json"
+        )
+        self.client._increase_weight("front_door", clock_at(1_700_000_000.0, 3))
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def file_mode(self) -> int:
+        return stat.S_IMODE(os.stat(self.client.weights_file).st_mode)
+
+    def test_save_creates_readable_file(self):
+        self.client._save_weights()
+        assert self.file_mode() == 0o644
+        assert os.listdir(self.tmp_dir.name) == ["notification_weights.json"]
+
+    def test_save_keeps_existing_mode(self):
+        with open(self.client.weights_file, "w") as f:
+            f.write("{}")
+        os.chmod(self.client.weights_file, 0o640)
+
+        self.client._save_weights()
+        assert self.file_mode() == 0o640
+
+
+def review_notification(user: str, review_id: str, title: str) -> PushNotification:
+    return PushNotification(
+        user=user,
+        payload={"after": {"id": review_id}},
+        title=title,
+        message="",
+    )
+
+
+class TestNotificationDrain(unittest.TestCase):
+    def setUp(self):
+        self.client = WebPushClient.__new__(WebPushClient)
+        self.client.notification_queue = queue.SimpleQueue()
+
+    def queue_notifications(self, *notifications):
+        for notification in notifications:
+            self.client.notification_queue.put(notification)
+
+    def test_newest_notification_wins(self):
+        self.queue_notifications(
+            review_notification("admin", "review1", "first"),
+            review_notification("admin", "review1", "second"),
+            review_notification("admin", "review1", "third"),
+        )
+
+        notifications, stopping = self.client._drain_notifications()
+        assert [n.title for n in notifications] == ["third"]
+        assert not stopping
+
+    def test_different_reviews_are_kept(self):
+        self.queue_notifications(
+            review_notification("admin", "review1", "first"),
+            review_notification("admin", "review2", "second"),
+            review_notification("viewer", "review1", "third"),
+            review_notification("admin", "review1", "fourth"),
+        )
+
+        notifications, stopping = self.client._drain_notifications()
+        assert [n.title for n in notifications] == ["fourth", "second", "third"]
+        assert not stopping
+
+    def test_notifications_without_review_are_kept(self):
+        self.queue_notifications(
+            PushNotification(user="admin", payload={}, title="one", message=""),
+            PushNotification(user="admin", payload={}, title="two", message=""),
+        )
+
+        notifications, _ = self.client._drain_notifications()
+        assert [n.title for n in notifications] == ["one", "two"]
+
+    def test_stop_signal_stops_drain(self):
+        self.queue_notifications(
+            review_notification("admin", "review1", "first"),
+            None,
+            review_notification("admin", "review2", "second"),
+        )
+
+        notifications, stopping = self.client._drain_notifications()
+        assert [n.title for n in notifications] == ["first"]
+        assert stopping
+
+        # notifications queued after the stop signal are left in the queue
+        assert self.client.notification_queue.qsize() == 1
+
+    def test_stop_signal_without_notifications(self):
+        self.queue_notifications(None)
+
+        notifications, stopping = self.client._drain_notifications()
+        assert notifications == []
+        assert stopping
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1 @@
+VERSION = "0.17.0-local"